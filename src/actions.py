@@ -3,22 +3,155 @@ Action execution module for Android Action Kernel.
 Handles all ADB commands for interacting with Android devices.
 """
 
+import atexit
+import secrets
+import shlex
 import subprocess
-import time
-from typing import Dict, Any, List
+import threading
+from typing import Callable, Dict, Any, List, Optional
 
 from config import Config
 from constants import (
     KEYCODE_ENTER,
     KEYCODE_HOME,
     KEYCODE_BACK,
-    SWIPE_COORDS,
-    SWIPE_DURATION_MS,
+    SWIPE_CMDS,
 )
 
 
+class _ShellDied(Exception):
+    """The adb shell session ended before a command's end marker arrived."""
+
+    def __init__(self, output: str, sent: bool):
+        super().__init__(output)
+        self.output = output
+        # Whether the command may already have reached the device
+        self.sent = sent
+
+
+class _AdbShell:
+    """A long-lived `adb shell` session reused for every on-device command."""
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self._sentinel = ""
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        try:
+            self._proc = subprocess.Popen(
+                [Config.ADB_PATH, "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=1,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except OSError as e:
+            raise _ShellDied(str(e), sent=False)
+        # Marker echoed after every command so the reader knows where its output
+        # ends; random per session so screen text streamed back cannot fake it
+        self._sentinel = f"__END_{secrets.token_hex(8)}__"
+
+    def _send(self, commands: List[str]) -> str:
+        if self._proc is None or self._proc.poll() is not None:
+            self._start()
+
+        # Every command gets its own marker so each exit status is checked,
+        # while the whole batch still goes out in a single write
+        script = "".join(f"{command}\necho {self._sentinel}$?\n" for command in commands)
+        try:
+            self._proc.stdin.write(script)
+            self._proc.stdin.flush()
+        except OSError:
+            raise _ShellDied(self._remaining_output(), sent=False)
+
+        results = []
+        output = []
+        while len(results) < len(commands):
+            line = self._proc.stdout.readline()
+            if not line:
+                results.append("".join(output))
+                raise _ShellDied("".join(results).strip(), sent=True)
+            marker = line.find(self._sentinel)
+            if marker == -1:
+                output.append(line)
+                continue
+
+            # Output without a trailing newline shares a line with the marker
+            output.append(line[:marker])
+            status = line[marker + len(self._sentinel):].strip()
+            result = "".join(output).strip()
+            if status != "0":
+                print(f"❌ ADB Error (exit {status}): {result}")
+            results.append(result)
+            output = []
+
+        return "\n".join(result for result in results if result)
+
+    def _remaining_output(self) -> str:
+        """Collects what adb printed before the session went away."""
+        try:
+            self._proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        try:
+            return self._proc.stdout.read().strip()
+        except OSError:
+            return ""
+
+    def run(self, commands: List[str]) -> str:
+        """Runs commands in the shell session and returns their combined output."""
+        with self._lock:
+            try:
+                return self._send(commands)
+            except _ShellDied as e:
+                self.close()
+                if e.sent:
+                    return self._report(e)
+                first_error = e
+
+            # Nothing reached the device, so a fresh session cannot repeat the command
+            try:
+                return self._send(commands)
+            except _ShellDied as e:
+                self.close()
+                return self._report(e if e.output else first_error)
+
+    def _report(self, error: _ShellDied) -> str:
+        print(f"❌ ADB Error: {error.output or 'adb shell closed unexpectedly'}")
+        return ""
+
+    def close(self) -> None:
+        """Terminates the shell session if one is open."""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        self._proc = None
+
+
+_adb_shell = _AdbShell()
+atexit.register(_adb_shell.close)
+
+
+def run_adb_shell(command: str) -> str:
+    """Executes a command on the device through the persistent ADB shell."""
+    return _adb_shell.run([command])
+
+
+def run_adb_script(lines: List[str]) -> str:
+    """Executes several shell commands in a single ADB round trip."""
+    return _adb_shell.run(lines)
+
+
 def run_adb_command(command: List[str]) -> str:
-    """Executes a shell command via ADB."""
+    """Executes a non-shell ADB command (e.g. pull, push)."""
     result = subprocess.run(
         [Config.ADB_PATH] + command,
         capture_output=True,
@@ -29,85 +162,91 @@ def run_adb_command(command: List[str]) -> str:
     return result.stdout.strip()
 
 
-def execute_action(action: Dict[str, Any]) -> None:
-    """Executes the action decided by the LLM."""
+def execute_action(action: Dict[str, Any], followup: Optional[List[str]] = None) -> str:
+    """
+    Executes the action decided by the LLM.
+
+    Any `followup` shell commands (e.g. the next screen dump) are sent in the
+    same ADB round trip as the action itself. Returns the script output.
+    """
     act_type = action.get("action")
 
-    if act_type == "tap":
-        _execute_tap(action)
-    elif act_type == "type":
-        _execute_type(action)
-    elif act_type == "enter":
-        _execute_enter()
-    elif act_type == "swipe":
-        _execute_swipe(action)
-    elif act_type == "home":
-        _execute_home()
-    elif act_type == "back":
-        _execute_back()
-    elif act_type == "wait":
-        _execute_wait()
-    elif act_type == "done":
-        _execute_done()
+    handler = _DISPATCH.get(act_type)
+    if handler is not None:
+        commands = handler(action)
     else:
         print(f"⚠️ Unknown action: {act_type}")
+        commands = []
 
+    commands += followup or []
+    if not commands:
+        return ""
+    return run_adb_script(commands)
 
-def _execute_tap(action: Dict[str, Any]) -> None:
-    """Execute a tap action at specified coordinates."""
+
+def _execute_tap(action: Dict[str, Any]) -> List[str]:
+    """Build the commands for a tap at specified coordinates."""
     x, y = action.get("coordinates", [0, 0])
     print(f"👉 Tapping: ({x}, {y})")
-    run_adb_command(["shell", "input", "tap", str(x), str(y)])
+    return [f"input tap {x} {y}"]
 
 
-def _execute_type(action: Dict[str, Any]) -> None:
-    """Execute a type action to input text."""
+def _execute_type(action: Dict[str, Any]) -> List[str]:
+    """Build the commands to input text."""
     text = action.get("text", "")
     # ADB requires %s for spaces
     escaped_text = text.replace(" ", "%s")
     print(f"⌨️ Typing: {text}")
-    run_adb_command(["shell", "input", "text", escaped_text])
+    return [f"input text {shlex.quote(escaped_text)}"]
 
 
-def _execute_enter() -> None:
+def _execute_enter() -> List[str]:
     """Press the Enter key."""
     print("⏎ Pressing Enter")
-    run_adb_command(["shell", "input", "keyevent", KEYCODE_ENTER])
+    return [f"input keyevent {KEYCODE_ENTER}"]
 
 
-def _execute_swipe(action: Dict[str, Any]) -> None:
-    """Execute a swipe action in the specified direction."""
+def _execute_swipe(action: Dict[str, Any]) -> List[str]:
+    """Build the commands for a swipe in the specified direction."""
     direction = action.get("direction", "up")
-    coords = SWIPE_COORDS.get(direction, SWIPE_COORDS["up"])
 
     print(f"👆 Swiping {direction.capitalize()}")
-    run_adb_command([
-        "shell", "input", "swipe",
-        str(coords[0]), str(coords[1]),
-        str(coords[2]), str(coords[3]),
-        SWIPE_DURATION_MS
-    ])
+    return [SWIPE_CMDS.get(direction, SWIPE_CMDS["up"])]
 
 
-def _execute_home() -> None:
+def _execute_home() -> List[str]:
     """Navigate to home screen."""
     print("🏠 Going Home")
-    run_adb_command(["shell", "input", "keyevent", KEYCODE_HOME])
+    return [f"input keyevent {KEYCODE_HOME}"]
 
 
-def _execute_back() -> None:
+def _execute_back() -> List[str]:
     """Navigate back."""
     print("🔙 Going Back")
-    run_adb_command(["shell", "input", "keyevent", KEYCODE_BACK])
+    return [f"input keyevent {KEYCODE_BACK}"]
 
 
-def _execute_wait() -> None:
+def _execute_wait() -> List[str]:
     """Wait for UI to load."""
     print("⏳ Waiting...")
-    time.sleep(2)
+    # Sleep on the device so any followup commands still share the round trip
+    return ["sleep 2"]
 
 
-def _execute_done() -> None:
+def _execute_done() -> List[str]:
     """Mark task as complete and exit."""
     print("✅ Goal Achieved.")
     exit(0)
+
+
+# Maps each LLM action name to the handler that builds its shell commands
+_DISPATCH: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "tap": _execute_tap,
+    "type": _execute_type,
+    "enter": lambda action: _execute_enter(),
+    "swipe": _execute_swipe,
+    "home": lambda action: _execute_home(),
+    "back": lambda action: _execute_back(),
+    "wait": lambda action: _execute_wait(),
+    "done": lambda action: _execute_done(),
+}
@@ -5,6 +5,7 @@ Loads settings from environment variables and explicit .env file.
 
 from __future__ import annotations
 
+from functools import cache, lru_cache
 from typing import List
 
 from pydantic import Field, field_validator
@@ -12,15 +13,16 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from constants import (
     DEVICE_DUMP_PATH as DEFAULT_DEVICE_DUMP_PATH,
-    LOCAL_DUMP_PATH as DEFAULT_LOCAL_DUMP_PATH,
     DEFAULT_MAX_STEPS,
     DEFAULT_STEP_DELAY,
+    DEFAULT_HISTORY_WINDOW,
     DEFAULT_GROQ_MODEL,
     DEFAULT_OPENAI_MODEL,
     DEFAULT_BEDROCK_MODEL,
 )
 
 SUPPORTED_PROVIDERS = ("openai", "groq", "bedrock")
+_SUPPORTED_PROVIDER_SET = frozenset(SUPPORTED_PROVIDERS)
 
 
 class Settings(BaseSettings):
@@ -29,6 +31,7 @@ class Settings(BaseSettings):
     adb_path: str = Field(default="adb", alias="ADB_PATH")
     max_steps: int = Field(default=DEFAULT_MAX_STEPS, alias="MAX_STEPS")
     step_delay: float = Field(default=DEFAULT_STEP_DELAY, alias="STEP_DELAY")
+    history_window: int = Field(default=DEFAULT_HISTORY_WINDOW, alias="HISTORY_WINDOW", ge=1)
 
     llm_providers: List[str] = Field(default_factory=lambda: ["openai"], alias="LLM_PROVIDERS")
 
@@ -55,7 +58,10 @@ class Settings(BaseSettings):
         return value  # type: ignore[return-value]
 
 
-_settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings once per process; call get_settings.cache_clear() to reload."""
+    return Settings()
 
 
 class classproperty(property):
@@ -67,28 +73,56 @@ class Config:
     """Application configuration loaded from environment."""
 
     # ADB Configuration
-    ADB_PATH: str = _settings.adb_path
+    @classproperty
+    def ADB_PATH(cls) -> str:
+        return get_settings().adb_path
+
     SCREEN_DUMP_PATH: str = DEFAULT_DEVICE_DUMP_PATH
-    LOCAL_DUMP_PATH: str = DEFAULT_LOCAL_DUMP_PATH
 
     # Agent Configuration
-    MAX_STEPS: int = _settings.max_steps
-    STEP_DELAY: float = _settings.step_delay
+    @classproperty
+    def MAX_STEPS(cls) -> int:
+        return get_settings().max_steps
+
+    @classproperty
+    def STEP_DELAY(cls) -> float:
+        return get_settings().step_delay
+
+    @classproperty
+    def HISTORY_WINDOW(cls) -> int:
+        return get_settings().history_window
 
     # Provider selection
-    LLM_PROVIDERS: List[str] = _settings.llm_providers
+    @classproperty
+    def LLM_PROVIDERS(cls) -> List[str]:
+        return get_settings().llm_providers
 
     # Groq Configuration
-    GROQ_API_KEY: str = _settings.groq_api_key
-    GROQ_MODEL: str = _settings.groq_model
+    @classproperty
+    def GROQ_API_KEY(cls) -> str:
+        return get_settings().groq_api_key
+
+    @classproperty
+    def GROQ_MODEL(cls) -> str:
+        return get_settings().groq_model
 
     # OpenAI Configuration
-    OPENAI_API_KEY: str = _settings.openai_api_key
-    OPENAI_MODEL: str = _settings.openai_model
+    @classproperty
+    def OPENAI_API_KEY(cls) -> str:
+        return get_settings().openai_api_key
+
+    @classproperty
+    def OPENAI_MODEL(cls) -> str:
+        return get_settings().openai_model
 
     # AWS Bedrock Configuration
-    AWS_REGION: str = _settings.aws_region
-    BEDROCK_MODEL: str = _settings.bedrock_model
+    @classproperty
+    def AWS_REGION(cls) -> str:
+        return get_settings().aws_region
+
+    @classproperty
+    def BEDROCK_MODEL(cls) -> str:
+        return get_settings().bedrock_model
 
     @classmethod
     def _provider_has_credentials(cls, provider: str) -> bool:
@@ -102,27 +136,12 @@ class Config:
 
     @classmethod
     def resolve_provider(cls, require_credentials: bool = False) -> str:
-        providers = cls.LLM_PROVIDERS or ["openai"]
-        supported = [p for p in providers if p in SUPPORTED_PROVIDERS]
-        if not supported:
-            raise ValueError(
-                "Unsupported LLM providers: "
-                f"{', '.join(providers)}. Supported: {', '.join(SUPPORTED_PROVIDERS)}"
-            )
-
-        if require_credentials:
-            for provider in supported:
-                if cls._provider_has_credentials(provider):
-                    return provider
-            raise ValueError(
-                "No valid LLM provider found. Provide credentials for one of: "
-                f"{', '.join(supported)}"
-            )
+        return _resolve_provider(require_credentials)
 
-        for provider in supported:
-            if cls._provider_has_credentials(provider):
-                return provider
-        return supported[0]
+    @classmethod
+    def reset_provider_cache(cls) -> None:
+        """Forget the resolved provider, e.g. after get_settings.cache_clear()."""
+        _resolve_provider.cache_clear()
 
     @classproperty
     def LLM_PROVIDER(cls) -> str:
@@ -148,3 +167,29 @@ class Config:
         elif provider == "openai" and not cls.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is required when using OpenAI provider")
         # Bedrock uses AWS credential chain, no explicit validation needed
+
+
+@cache
+def _resolve_provider(require_credentials: bool) -> str:
+    """Pick the LLM provider; memoized since the environment is fixed per process."""
+    providers = Config.LLM_PROVIDERS or ["openai"]
+    supported = [p for p in providers if p in _SUPPORTED_PROVIDER_SET]
+    if not supported:
+        raise ValueError(
+            "Unsupported LLM providers: "
+            f"{', '.join(providers)}. Supported: {', '.join(SUPPORTED_PROVIDERS)}"
+        )
+
+    if require_credentials:
+        for provider in supported:
+            if Config._provider_has_credentials(provider):
+                return provider
+        raise ValueError(
+            "No valid LLM provider found. Provide credentials for one of: "
+            f"{', '.join(supported)}"
+        )
+
+    for provider in supported:
+        if Config._provider_has_credentials(provider):
+            return provider
+    return supported[0]
@@ -31,6 +31,12 @@ SWIPE_COORDS = {
 }
 SWIPE_DURATION_MS = "300"
 
+# Full `input swipe` shell commands per direction, built once at import
+SWIPE_CMDS = {
+    direction: f"input swipe {x1} {y1} {x2} {y2} {SWIPE_DURATION_MS}"
+    for direction, (x1, y1, x2, y2) in SWIPE_COORDS.items()
+}
+
 # ===========================================
 # Default Models
 # ===========================================
@@ -48,10 +54,15 @@ BEDROCK_META_MODELS = ["meta", "llama"]
 # File Paths
 # ===========================================
 DEVICE_DUMP_PATH = "/sdcard/window_dump.xml"
-LOCAL_DUMP_PATH = "window_dump.xml"
+
+# ===========================================
+# Screen State Cache
+# ===========================================
+SCREEN_CACHE_SIZE = 4
 
 # ===========================================
 # Agent Defaults
 # ===========================================
 DEFAULT_MAX_STEPS = 10
 DEFAULT_STEP_DELAY = 2.0
+DEFAULT_HISTORY_WINDOW = 5
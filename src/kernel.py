@@ -8,34 +8,67 @@ Usage:
     python kernel.py
 """
 
-import os
-import json
-import time
-from typing import List, Dict, Any
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import orjson
 
 from config import Config
-from actions import execute_action, run_adb_command
+from constants import SCREEN_CACHE_SIZE
+from actions import execute_action, run_adb_shell
 from llm_providers import get_llm_provider
 import sanitizer
 
 
-def get_screen_state() -> str:
-    """Dumps the current UI XML and returns the sanitized JSON string."""
-    # 1. Capture XML from device
-    run_adb_command(["shell", "uiautomator", "dump", Config.SCREEN_DUMP_PATH])
+# Sanitized screen states keyed by the digest of their XML dump. Consecutive
+# dumps are often identical (e.g. after "wait"), so skip re-parsing them.
+_screen_cache: OrderedDict[bytes, str] = OrderedDict()
+
+
+def _screen_dump_command() -> str:
+    """Shell command that dumps the current UI XML and streams it to stdout."""
+    # Remove the previous dump first: uiautomator can exit 0 without writing
+    # one, and the last step's XML must not be mistaken for the current screen
+    return (
+        f"rm -f {Config.SCREEN_DUMP_PATH};"
+        f" uiautomator dump {Config.SCREEN_DUMP_PATH} >/dev/null"
+        f" && cat {Config.SCREEN_DUMP_PATH}"
+    )
+
 
-    # 2. Pull to local machine
-    run_adb_command(["pull", Config.SCREEN_DUMP_PATH, Config.LOCAL_DUMP_PATH])
+def get_screen_state(xml_content: Optional[str] = None) -> str:
+    """
+    Dumps the current UI XML and returns the sanitized JSON string.
+
+    Args:
+        xml_content: Dump already streamed back as part of the last action
+    """
+    # 1. Capture XML from device over the shell session (no pull or local file)
+    if xml_content is None:
+        xml_content = run_adb_shell(_screen_dump_command())
 
-    # 3. Read & Sanitize
-    if not os.path.exists(Config.LOCAL_DUMP_PATH):
+    # Skip anything the batched action commands printed before the dump
+    start = xml_content.find("<?xml")
+    if start == -1:
         return "Error: Could not capture screen."
 
-    with open(Config.LOCAL_DUMP_PATH, "r", encoding="utf-8") as f:
-        xml_content = f.read()
+    # 2. Sanitize, reusing the result when the screen has not changed
+    xml_bytes = xml_content[start:].encode("utf-8")
+    digest = hashlib.blake2b(xml_bytes, digest_size=16).digest()
+    cached = _screen_cache.get(digest)
+    if cached is not None:
+        _screen_cache.move_to_end(digest)
+        return cached
 
-    elements = sanitizer.get_interactive_elements(xml_content)
-    return json.dumps(elements, indent=2)
+    elements = sanitizer.get_interactive_elements(xml_bytes)
+    screen_state = orjson.dumps(elements, option=orjson.OPT_INDENT_2).decode()
+
+    _screen_cache[digest] = screen_state
+    if len(_screen_cache) > SCREEN_CACHE_SIZE:
+        _screen_cache.popitem(last=False)
+    return screen_state
 
 
 def run_agent(goal: str, max_steps: int = None) -> None:
@@ -53,30 +86,41 @@ def run_agent(goal: str, max_steps: int = None) -> None:
     print(f"📋 Goal: {goal}")
     print(f"🤖 Provider: {Config.LLM_PROVIDER} ({Config.get_model()})")
 
-    # Initialize LLM provider
-    llm = get_llm_provider()
-    action_history: List[Dict[str, Any]] = []
-
-    for step in range(max_steps):
-        print(f"\n--- Step {step + 1}/{max_steps} ---")
-
-        # 1. Perception: Capture screen state
-        print("👀 Scanning Screen...")
-        screen_context = get_screen_state()
-
-        # 2. Reasoning: Get LLM decision
-        print("🧠 Thinking...")
-        decision = llm.get_decision(goal, screen_context, action_history)
-        print(f"💡 Decision: {decision.get('reason', 'No reason provided')}")
-
-        # 3. Action: Execute the decision
-        execute_action(decision)
-
-        # Track action history for context
-        action_history.append(decision)
-
-        # Wait for UI to update
-        time.sleep(Config.STEP_DELAY)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Capture the first screen while the LLM client is being set up
+        next_screen_future: Future = executor.submit(get_screen_state)
+
+        # Initialize LLM provider
+        llm = get_llm_provider()
+        action_history: List[Dict[str, Any]] = []
+
+        for step in range(max_steps):
+            print(f"\n--- Step {step + 1}/{max_steps} ---")
+
+            # 1. Perception: Collect the screen state prefetched after the last action
+            print("👀 Scanning Screen...")
+            screen_context = next_screen_future.result()
+
+            # 2. Reasoning: Get LLM decision
+            print("🧠 Thinking...")
+            decision = llm.get_decision(goal, screen_context, action_history)
+            print(f"💡 Decision: {decision.get('reason', 'No reason provided')}")
+
+            # 3. Action: Execute the decision, let the UI settle, then stream
+            # back the next screen, all in the same ADB round trip
+            last_step = step + 1 == max_steps
+            next_xml = execute_action(decision, followup=None if last_step else [
+                f"sleep {Config.STEP_DELAY}",
+                _screen_dump_command(),
+            ])
+
+            # Sanitize the new screen in the background
+            if not last_step:
+                next_screen_future = executor.submit(get_screen_state, next_xml)
+
+            # Track a rolling window of action history for context
+            action_history.append({**decision, "step": step + 1})
+            del action_history[:-Config.HISTORY_WINDOW]
 
     print("\n⚠️ Max steps reached. Task may be incomplete.")
 
@@ -3,10 +3,13 @@ LLM Provider module for Android Action Kernel.
 Supports OpenAI, Groq, and AWS Bedrock.
 """
 
+import atexit
 import json
-import re
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from functools import cache
+from typing import Dict, Any, List, Optional
+
+import orjson
 
 from config import Config
 from constants import GROQ_API_BASE_URL, BEDROCK_ANTHROPIC_MODELS, BEDROCK_META_MODELS
@@ -57,26 +60,54 @@ Example - Opening app drawer to find an app:
 """
 
 
+_HISTORY_LINE = "Step {}: {} - {}".format
+
+
 def format_action_history(action_history: List[Dict]) -> str:
     """Format action history for LLM context."""
     if not action_history:
         return ""
 
-    history_lines = []
+    # The kernel keeps a rolling window; reserve a slot to note the steps
+    # that fell out of it
+    first_step = action_history[0].get("step", 1)
+    offset = 1 if first_step > 1 else 0
+
+    history_lines = [""] * (len(action_history) + offset)
+    if first_step == 2:
+        history_lines[0] = "Step 1: earlier action omitted"
+    elif offset:
+        history_lines[0] = f"Steps 1-{first_step - 1}: earlier actions omitted"
+
     for i, action in enumerate(action_history):
         action_type = action.get("action", "unknown")
         reason = action.get("reason", "N/A")
+        step = action.get("step", i + 1)
 
         if action_type == "type":
-            history_lines.append(f"Step {i+1}: typed \"{action.get('text', '')}\" - {reason}")
+            summary = f"typed \"{action.get('text', '')}\""
         elif action_type == "tap":
-            history_lines.append(f"Step {i+1}: tapped {action.get('coordinates', [])} - {reason}")
+            summary = f"tapped {action.get('coordinates', [])}"
         else:
-            history_lines.append(f"Step {i+1}: {action_type} - {reason}")
+            summary = action_type
+        history_lines[i + offset] = _HISTORY_LINE(step, summary, reason)
 
     return "\n\nPREVIOUS_ACTIONS:\n" + "\n".join(history_lines)
 
 
+def build_user_content(goal: str, screen_context: str, action_history: List[Dict]) -> str:
+    """
+    Build the user message for a step.
+
+    The goal comes first so that, together with the system prompt, it forms a
+    prefix that stays identical across steps for providers with prompt
+    caching. The action history follows; once its rolling window is full it
+    changes every step, as does the screen context, which goes last.
+    """
+    history_str = format_action_history(action_history)
+    return f"GOAL: {goal}{history_str}\n\nSCREEN_CONTEXT:\n{screen_context}"
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
@@ -90,21 +121,28 @@ class OpenAIProvider(LLMProvider):
     """OpenAI and Groq provider (OpenAI-compatible API)."""
 
     def __init__(self):
+        import httpx
         from openai import OpenAI
 
+        # Keep connections alive between steps to skip a TLS handshake per call
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60)
+        )
+        atexit.register(self.http_client.close)
+
         if Config.LLM_PROVIDER == "groq":
             self.client = OpenAI(
                 api_key=Config.GROQ_API_KEY,
-                base_url=GROQ_API_BASE_URL
+                base_url=GROQ_API_BASE_URL,
+                http_client=self.http_client
             )
             self.model = Config.GROQ_MODEL
         else:
-            self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+            self.client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=self.http_client)
             self.model = Config.OPENAI_MODEL
 
     def get_decision(self, goal: str, screen_context: str, action_history: List[Dict]) -> Dict[str, Any]:
-        history_str = format_action_history(action_history)
-        user_content = f"GOAL: {goal}\n\nSCREEN_CONTEXT:\n{screen_context}{history_str}"
+        user_content = build_user_content(goal, screen_context, action_history)
 
         response = self.client.chat.completions.create(
             model=self.model,
@@ -115,7 +153,7 @@ class OpenAIProvider(LLMProvider):
             ]
         )
 
-        return json.loads(response.choices[0].message.content)
+        return orjson.loads(response.choices[0].message.content)
 
 
 class BedrockProvider(LLMProvider):
@@ -123,15 +161,24 @@ class BedrockProvider(LLMProvider):
 
     def __init__(self):
         import boto3
+        from botocore.config import Config as BotoConfig
+
         self.client = boto3.client(
             service_name="bedrock-runtime",
-            region_name=Config.AWS_REGION
+            region_name=Config.AWS_REGION,
+            config=BotoConfig(
+                max_pool_connections=4,
+                retries={"max_attempts": 2, "mode": "standard"},
+                tcp_keepalive=True
+            )
         )
         self.model = Config.BEDROCK_MODEL
+        # The model never changes after init, so classify it once
+        self._family = _model_family(self.model)
+        self._init_request_template()
 
     def get_decision(self, goal: str, screen_context: str, action_history: List[Dict]) -> Dict[str, Any]:
-        history_str = format_action_history(action_history)
-        user_content = f"GOAL: {goal}\n\nSCREEN_CONTEXT:\n{screen_context}{history_str}"
+        user_content = build_user_content(goal, screen_context, action_history)
 
         request_body = self._build_request(user_content)
 
@@ -142,50 +189,55 @@ class BedrockProvider(LLMProvider):
             accept="application/json"
         )
 
-        response_body = json.loads(response["body"].read())
+        response_body = orjson.loads(response["body"].read())
         result_text = self._extract_response(response_body)
 
         return self._parse_json_response(result_text)
 
-    def _is_anthropic_model(self) -> bool:
-        """Check if current model is an Anthropic model."""
-        return any(identifier in self.model for identifier in BEDROCK_ANTHROPIC_MODELS)
-
-    def _is_meta_model(self) -> bool:
-        """Check if current model is a Meta/Llama model."""
-        return any(identifier in self.model.lower() for identifier in BEDROCK_META_MODELS)
-
-    def _build_request(self, user_content: str) -> str:
-        """Build request body based on model type."""
-        if self._is_anthropic_model():
-            return json.dumps({
+    def _init_request_template(self) -> None:
+        """Precompute the constant parts of the request body for the model type."""
+        if self._family == "anthropic":
+            self._prompt_prefix = ""
+            self._prompt_suffix = "\n\nRespond with ONLY a valid JSON object."
+            self._request_template = {
                 "anthropic_version": "bedrock-2023-05-31",
                 "max_tokens": 1024,
-                "system": SYSTEM_PROMPT,
-                "messages": [
-                    {"role": "user", "content": user_content + "\n\nRespond with ONLY a valid JSON object."}
-                ]
-            })
-        elif self._is_meta_model():
-            return json.dumps({
-                "prompt": f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{SYSTEM_PROMPT}<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n{user_content}\n\nRespond with ONLY a valid JSON object, no other text.<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n",
+                "system": SYSTEM_PROMPT
+            }
+        elif self._family == "meta":
+            self._prompt_prefix = f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{SYSTEM_PROMPT}<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n"
+            self._prompt_suffix = "\n\nRespond with ONLY a valid JSON object, no other text.<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+            self._request_template = {
                 "max_gen_len": 512,
                 "temperature": 0.1
-            })
+            }
         else:
-            return json.dumps({
-                "inputText": f"{SYSTEM_PROMPT}\n\n{user_content}\n\nRespond with ONLY a valid JSON object.",
+            self._prompt_prefix = f"{SYSTEM_PROMPT}\n\n"
+            self._prompt_suffix = "\n\nRespond with ONLY a valid JSON object."
+            self._request_template = {
                 "textGenerationConfig": {
                     "maxTokenCount": 512,
                     "temperature": 0.1
                 }
-            })
+            }
+
+    def _build_request(self, user_content: str) -> bytes:
+        """Build request body based on model type."""
+        prompt = self._prompt_prefix + user_content + self._prompt_suffix
+        body = self._request_template.copy()
+        if self._family == "anthropic":
+            body["messages"] = [{"role": "user", "content": prompt}]
+        elif self._family == "meta":
+            body["prompt"] = prompt
+        else:
+            body["inputText"] = prompt
+        return orjson.dumps(body)
 
     def _extract_response(self, response_body: Dict) -> str:
         """Extract text response based on model type."""
-        if self._is_anthropic_model():
+        if self._family == "anthropic":
             return response_body["content"][0]["text"]
-        elif self._is_meta_model():
+        elif self._family == "meta":
             return response_body.get("generation", "")
         else:
             return response_body["results"][0]["outputText"]
@@ -193,19 +245,64 @@ class BedrockProvider(LLMProvider):
     def _parse_json_response(self, text: str) -> Dict[str, Any]:
         """Parse JSON from LLM response, handling extra text."""
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Try to find JSON object in the response
-            json_match = re.search(r'\{[^{}]*\}', text)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                print(f"⚠️ Could not parse LLM response: {text[:200]}")
-                return {"action": "wait", "reason": "Failed to parse response, waiting"}
-
-
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+
+        # Try to find JSON object in the response; stdlib json is more lenient here
+        start = text.find("{")
+        while start != -1:
+            candidate = _balanced_object(text, start)
+            if candidate is None:
+                start = text.find("{", start + 1)
+                continue
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                start = text.find("{", start + 1)
+
+        print(f"⚠️ Could not parse LLM response: {text[:200]}")
+        return {"action": "wait", "reason": "Failed to parse response, waiting"}
+
+
+def _model_family(model: str) -> str:
+    """Classify a Bedrock model ID as "anthropic", "meta" (Llama) or "other"."""
+    if any(identifier in model for identifier in BEDROCK_ANTHROPIC_MODELS):
+        return "anthropic"
+    model_lower = model.lower()
+    if any(identifier in model_lower for identifier in BEDROCK_META_MODELS):
+        return "meta"
+    return "other"
+
+
+def _balanced_object(text: str, start: int) -> Optional[str]:
+    """Return the {...} span opening at `start`, honouring nesting and strings."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+@cache
 def get_llm_provider() -> LLMProvider:
-    """Factory function to get the appropriate LLM provider."""
+    """Factory function to get the appropriate LLM provider (one per process)."""
     if Config.LLM_PROVIDER == "bedrock":
         return BedrockProvider()
     else:
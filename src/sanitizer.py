@@ -1,69 +1,105 @@
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional
+import io
+import re
+from typing import List, Dict, Optional, Union
 
-def get_interactive_elements(xml_content: str) -> List[Dict]:
+from lxml import etree
+
+# Bounds attribute: "[x1,y1][x2,y2]"
+_BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+def get_interactive_elements(xml_content: Union[str, bytes]) -> List[Dict]:
     """
     Parses Android Accessibility XML and returns a lean list of interactive elements.
     Calculates center coordinates (x, y) for every clickable element.
+
+    The dump is parsed incrementally and every node is freed once processed,
+    so memory stays bounded by the depth of the layout hierarchy.
     """
+    if isinstance(xml_content, str):
+        # lxml rejects str input that carries an encoding declaration
+        xml_content = xml_content.encode("utf-8")
+
+    # uiautomator emits every view as a <node> element. Nodes are read on
+    # "start" to keep document order and freed on "end".
+    # recover=True tolerates dumps truncated while the screen is loading.
+    events = etree.iterparse(
+        io.BytesIO(xml_content),
+        events=("start", "end"),
+        tag="node",
+        recover=True,
+        huge_tree=False,
+    )
+
+    elements = []
     try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError:
+        for event, node in events:
+            if event == "start":
+                element = _parse_node(node.attrib)
+                if element is not None:
+                    elements.append(element)
+                continue
+
+            node.clear()
+            # Drop already-processed siblings still referenced by the parent
+            while node.getprevious() is not None:
+                del node.getparent()[0]
+    except etree.XMLSyntaxError:
         print("⚠️ Error parsing XML. The screen might be loading.")
         return []
 
-    elements = []
+    return elements
+
+
+def _parse_node(attrib) -> Optional[Dict]:
+    """Builds the element entry for a node, or None if it should be skipped."""
+    get = attrib.get
+    # Filter: We only care about elements that are interactive or have information
+    is_clickable = get("clickable") == "true"
+    # Check for actual text input fields (not just focusable elements)
+    element_class = get("class", "")
+    is_editable = (
+        "EditText" in element_class or
+        "AutoCompleteTextView" in element_class or
+        get("editable") == "true"
+    )
+    text = get("text", "")
+    desc = get("content-desc", "")
+    resource_id = get("resource-id", "")
     
-    # Recursively find all nodes
-    for node in root.iter():
-        # Filter: We only care about elements that are interactive or have information
-        is_clickable = node.attrib.get("clickable") == "true"
-        # Check for actual text input fields (not just focusable elements)
-        element_class = node.attrib.get("class", "")
-        is_editable = (
-            "EditText" in element_class or
-            "AutoCompleteTextView" in element_class or
-            node.attrib.get("editable") == "true"
-        )
-        text = node.attrib.get("text", "")
-        desc = node.attrib.get("content-desc", "")
-        resource_id = node.attrib.get("resource-id", "")
-        
-        # Skip empty layout containers that do nothing
-        if not is_clickable and not is_editable and not text and not desc:
-            continue
-            
-        # Parse Bounds: "[140,200][400,350]" -> Center X, Y
-        bounds = node.attrib.get("bounds")
-        if bounds:
-            try:
-                # Extract coordinates
-                coords = bounds.replace("][", ",").replace("[", "").replace("]", "").split(",")
-                x1, y1, x2, y2 = map(int, coords)
-                
-                center_x = (x1 + x2) // 2
-                center_y = (y1 + y2) // 2
-                
-                # Determine suggested action based on element type
-                if is_editable:
-                    suggested_action = "type"
-                elif is_clickable:
-                    suggested_action = "tap"
-                else:
-                    suggested_action = "read"
+    # Skip empty layout containers that do nothing
+    if not is_clickable and not is_editable and not text and not desc:
+        return None
 
-                element = {
-                    "id": resource_id,
-                    "text": text or desc,  # Fallback to content-desc if text is empty
-                    "type": node.attrib.get("class", "").split(".")[-1],
-                    "bounds": bounds,
-                    "center": (center_x, center_y),
-                    "clickable": is_clickable,
-                    "editable": is_editable,
-                    "action": suggested_action
-                }
-                elements.append(element)
-            except Exception:
-                continue
+    # Parse Bounds: "[140,200][400,350]" -> Center X, Y
+    bounds = get("bounds")
+    if not bounds:
+        return None
+
+    # Extract coordinates
+    match = _BOUNDS_RE.match(bounds)
+    if not match:
+        return None
+    # Cannot fail: every group matched -?\d+
+    x1, y1, x2, y2 = map(int, match.groups())
+
+    center_x = (x1 + x2) // 2
+    center_y = (y1 + y2) // 2
+
+    # Determine suggested action based on element type
+    if is_editable:
+        suggested_action = "type"
+    elif is_clickable:
+        suggested_action = "tap"
+    else:
+        suggested_action = "read"
 
-    return elements
\ No newline at end of file
+    return {
+        "id": resource_id,
+        "text": text or desc,  # Fallback to content-desc if text is empty
+        "type": element_class.split(".")[-1],
+        "bounds": bounds,
+        "center": (center_x, center_y),
+        "clickable": is_clickable,
+        "editable": is_editable,
+        "action": suggested_action
+    }